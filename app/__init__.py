@@ -1,17 +1,30 @@
+import os
+import sqlite3
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 # Inicializar extensiones
 db = SQLAlchemy()
 login_manager = LoginManager()
 
-def create_app():
+# SQLite no aplica las llaves foráneas si no se activan en cada conexión
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+def create_app(create_tables=True):
     app = Flask(__name__)
     
     # Configuración básica
-    app.config['SECRET_KEY'] = 'clave-secreta-borregos-muy-segura'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///gestion_borregos.db'
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'clave-secreta-borregos-muy-segura'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///gestion_borregos.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
     # Inicializar extensiones con la app
@@ -19,6 +32,14 @@ def create_app():
     login_manager.init_app(app)
     login_manager.login_view = 'main.login'
     
+    # Historial de cambios (audit_log)
+    from app.audit import init_audit
+    init_audit()
+    
+    # Archivos estáticos con hash y compresión de respuestas
+    from app.assets import init_assets
+    init_assets(app)
+    
     # Configurar user_loader
     from app.models.user import User
     
@@ -26,6 +47,10 @@ def create_app():
     def load_user(user_id):
         return User.query.get(int(user_id))
     
+    # Comando `flask integrity-check`
+    from app.integrity import integrity_check
+    app.cli.add_command(integrity_check)
+    
     # Importar y registrar blueprints
     from app.routes.main import main_bp
     from app.routes.animals import animals_bp
@@ -45,10 +70,13 @@ def create_app():
     from app.models.inventory import Inventory
     from app.models.sale import Sale
     from app.models.user import User
+    from app.models.audit import AuditLog
     
-    # Crear tablas de la base de datos
-    with app.app_context():
-        db.create_all()
-        print("Tablas de la base de datos creadas correctamente")
+    # Crear tablas de la base de datos (se puede omitir si ya existen,
+    # p. ej. en arranques en frío de Cloud Functions)
+    if create_tables:
+        with app.app_context():
+            db.create_all()
+            print("Tablas de la base de datos creadas correctamente")
     
     return app
\ No newline at end of file
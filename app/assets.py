@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él solo se genera .gz
+    brotli = None
+
+# Carpeta (dentro de static) donde se escriben los archivos con hash
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Un año: los archivos con hash nunca cambian de contenido
+IMMUTABLE_MAX_AGE = 31536000
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.svg', '.txt', '.html', '.map'}
+MIN_COMPRESS_SIZE = 500
+
+# Orden de preferencia de las variantes precomprimidas
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write_compressed(path, data):
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+
+    for ext, compressed in variants.items():
+        # Solo vale la pena si realmente ocupa menos
+        if len(compressed) < len(data):
+            with open(path + ext, 'wb') as f:
+                f.write(compressed)
+
+
+def build_assets(static_folder):
+    """Genera copias con hash (y precomprimidas) de los archivos estáticos.
+
+    Escribe los archivos en static/dist junto con un manifest.json que
+    relaciona cada nombre original con su versión con hash.
+    """
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist_folder):
+        shutil.rmtree(dist_folder)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder and DIST_DIR in dirs:
+            dirs.remove(DIST_DIR)
+
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            filename = os.path.relpath(source, static_folder).replace(os.sep, '/')
+
+            with open(source, 'rb') as f:
+                data = f.read()
+
+            base, ext = os.path.splitext(filename)
+            hashed = f'{DIST_DIR}/{base}.{_fingerprint(data)}{ext}'
+            target = os.path.join(static_folder, *hashed.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+
+            if ext in COMPRESSIBLE_EXTENSIONS and len(data) >= MIN_COMPRESS_SIZE:
+                _write_compressed(target, data)
+
+            manifest[filename] = hashed
+
+    with open(os.path.join(dist_folder, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+def load_manifest(static_folder):
+    """Lee el manifiesto; lo ignora si algún archivo cambió después del build."""
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        manifest = json.load(f)
+    built_at = os.path.getmtime(path)
+
+    for filename, hashed in manifest.items():
+        source = os.path.join(static_folder, *filename.split('/'))
+        if not os.path.exists(source):
+            continue
+        # Solo se vuelve a calcular el hash de los archivos modificados
+        # después del build; el predeploy copia con `cp -p` para conservar
+        # las fechas y no alargar el arranque en frío
+        if os.path.getmtime(source) <= built_at:
+            continue
+        with open(source, 'rb') as f:
+            fingerprint = _fingerprint(f.read())
+        if f'.{fingerprint}.' not in os.path.basename(hashed) + '.':
+            print(f"{filename} cambió después de build_assets.py; "
+                  "se sirven los archivos sin hash")
+            return {}
+    return manifest
+
+
+def init_assets(app):
+    """Configura los archivos estáticos con hash y la compresión de respuestas.
+
+    Si no se ha ejecutado build_assets.py (o el build quedó desactualizado)
+    no hay manifiesto y los archivos se sirven tal cual. En modo debug
+    siempre se enlazan los archivos originales.
+    """
+    static_folder = app.static_folder
+    manifest = load_manifest(static_folder)
+    hashed_files = set(manifest.values())
+
+    # Variantes precomprimidas disponibles, calculadas una sola vez
+    precompressed = {
+        filename: [
+            (encoding, ext) for encoding, ext in ENCODINGS
+            if os.path.exists(os.path.join(static_folder, filename + ext))
+        ]
+        for filename in hashed_files
+    }
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        # url_for('static', filename='js/main.js') -> dist/js/main.<hash>.js
+        if app.debug:
+            return
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    def static(filename):
+        if filename not in hashed_files:
+            return app.send_static_file(filename)
+
+        response = None
+        for encoding, ext in precompressed[filename]:
+            if encoding in request.accept_encodings:
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                response = send_from_directory(static_folder, filename + ext, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+
+        if response is None:
+            response = app.send_static_file(filename)
+
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static
+
+    @app.after_request
+    def compress_html(response):
+        if (response.direct_passthrough
+                or response.mimetype != 'text/html'
+                or response.status_code < 200 or response.status_code >= 300
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if 'gzip' not in request.accept_encodings:
+            return response
+
+        data = response.get_data()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return response
+
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
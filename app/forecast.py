@@ -0,0 +1,301 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+# Multiplicador del precio de venta para cada escenario
+SCENARIOS = {
+    'pesimista': 0.8,
+    'base': 1.0,
+    'optimista': 1.2,
+}
+
+# Parámetros por defecto de la simulación
+DEFAULT_PARAMS = {
+    'lambing_rate': 1.3,          # corderos por oveja al año
+    'female_ratio': 0.5,          # proporción de hembras al nacer
+    'monthly_mortality': 0.005,
+    'annual_cull_rate': 0.15,     # adultos vendidos como desecho al año
+    'cull_price_factor': 0.7,     # precio del desecho respecto al cordero
+    'replacement_rate': 0.3,      # hembras jóvenes que se quedan en el rebaño
+    'sale_age': 6,                # meses
+    'maturity_age': 12,           # meses
+    'feed_kg_per_day': 1.5,       # consumo por cabeza
+    'default_price': 2500.0,      # si no hay ventas registradas
+    'default_feed_cost': 5.0,     # por kg, si no hay costos registrados
+    'price_volatility': 0.10,     # anual, si no hay suficientes ventas
+}
+
+# Rango válido (mínimo, máximo) de cada parámetro
+PARAM_RANGES = {
+    'lambing_rate': (0.0, 4.0),
+    'female_ratio': (0.0, 1.0),
+    'monthly_mortality': (0.0, 1.0),
+    'annual_cull_rate': (0.0, 1.0),
+    'cull_price_factor': (0.0, 10.0),
+    'replacement_rate': (0.0, 1.0),
+    'sale_age': (1, 24),
+    'maturity_age': (2, 36),
+    'feed_kg_per_day': (0.0, 20.0),
+    'default_price': (0.0, 1e7),
+    'default_feed_cost': (0.0, 1e5),
+    'price_volatility': (0.0, 2.0),
+}
+
+# Kilos por unidad de compra de alimento; 'saco' y 'bulto' no tienen un
+# peso fijo y quedan fuera del costo por kg
+KG_PER_UNIT = {
+    'kg': 1.0,
+    'g': 0.001,
+    'lb': 0.45359237,
+    'ton': 1000.0,
+}
+
+MAX_MONTHS = 36
+MAX_TRIALS = 100000
+
+DAYS_PER_MONTH = 30.4
+PERCENTILES = (10, 50, 90)
+METRICS = ('heads', 'births', 'sales', 'revenue', 'feed_kg', 'feed_cost')
+
+# Tamaño fijo de bloque: cada bloque tiene su propia semilla, así el
+# resultado no depende del número de procesos usados
+BLOCK_SIZE = 250
+
+# Proyecciones ya calculadas, por estado del rebaño y parámetros
+CACHE_SIZE = 32
+_cache = {}
+
+
+def _age_in_months(birth_date, today):
+    return (today.year - birth_date.year) * 12 + today.month - birth_date.month
+
+
+def load_flock_state(maturity_age=12):
+    """Resume el rebaño activo y los datos de mercado desde la base de datos.
+
+    Devuelve una tupla (hashable) que sirve como parte de la clave de caché.
+    La dispersión de precios se calcula sobre todas las ventas registradas,
+    sin considerar cuándo ocurrieron, y la simulación la usa como volatilidad
+    anual del precio. Con pocas ventas o ventas de animales muy distintos
+    esto sobreestima la variación real en el tiempo.
+    """
+    from app import db
+    from app.models.animal import Animal
+    from app.models.feed import Feed
+    from app.models.sale import Sale
+
+    today = date.today()
+    ewes = rams = 0
+    lambs_f = [0] * maturity_age
+    lambs_m = [0] * maturity_age
+
+    rows = db.session.query(Animal.gender, Animal.birth_date).filter(
+        Animal.status == 'active'
+    ).yield_per(5000)
+
+    for gender, birth_date in rows:
+        female = gender == 'Hembra'
+        age = _age_in_months(birth_date, today) if birth_date else maturity_age
+        if age >= maturity_age:
+            if female:
+                ewes += 1
+            else:
+                rams += 1
+        elif female:
+            lambs_f[max(age, 0)] += 1
+        else:
+            lambs_m[max(age, 0)] += 1
+
+    price_avg, price_sq, sale_count = db.session.query(
+        db.func.avg(Sale.sale_price),
+        db.func.avg(Sale.sale_price * Sale.sale_price),
+        db.func.count(Sale.id)
+    ).one()
+    if price_avg and sale_count > 1:
+        # Desviación estándar a partir de E[x²] - E[x]²
+        price_std = max(price_sq - price_avg * price_avg, 0.0) ** 0.5
+    else:
+        price_std = None
+
+    # Las compras se registran en distintas unidades; se convierten a kg
+    unit = db.func.lower(db.func.coalesce(Feed.unit, 'kg'))
+    feed_cost, feed_quantity = db.session.query(
+        db.func.sum(Feed.cost),
+        db.func.sum(Feed.quantity * db.case(KG_PER_UNIT, value=unit))
+    ).filter(Feed.cost.isnot(None), unit.in_(list(KG_PER_UNIT))).one()
+    cost_per_kg = feed_cost / feed_quantity if feed_cost and feed_quantity else None
+
+    return (ewes, rams, tuple(lambs_f), tuple(lambs_m),
+            price_avg, price_std, cost_per_kg)
+
+
+def _simulate_block(state, months, trials, price_factor, params, seed):
+    ewes0, rams0, lambs_f0, lambs_m0, price_avg, price_std, cost_per_kg = state
+    p = dict(params)
+    rng = np.random.default_rng(seed)
+
+    maturity = int(p['maturity_age'])
+    sale_age = min(int(p['sale_age']), maturity - 1)
+    survival = 1.0 - p['monthly_mortality']
+    monthly_cull = p['annual_cull_rate'] / 12
+    monthly_lambing = p['lambing_rate'] / 12
+
+    base_price = (price_avg or p['default_price']) * price_factor
+    if price_avg and price_std:
+        volatility = price_std / price_avg
+    else:
+        volatility = p['price_volatility']
+    cost_per_kg = cost_per_kg or p['default_feed_cost']
+
+    # Estado por ensayo: adultos (trials,) y corderos por edad en meses (trials, maturity)
+    ewes = np.full(trials, ewes0, dtype=np.int64)
+    rams = np.full(trials, rams0, dtype=np.int64)
+    lambs_f = np.tile(np.array(lambs_f0, dtype=np.int64), (trials, 1))
+    lambs_m = np.tile(np.array(lambs_m0, dtype=np.int64), (trials, 1))
+
+    # Los corderos que ya pasaron la edad de venta al iniciar se reparten
+    # en el primer mes igual que los demás: machos a la venta y solo una
+    # fracción de las hembras como reemplazo
+    kept_f = rng.binomial(lambs_f[:, sale_age + 1:], p['replacement_rate'])
+    initial_sales = (lambs_m[:, sale_age + 1:].sum(axis=1)
+                     + lambs_f[:, sale_age + 1:].sum(axis=1) - kept_f.sum(axis=1))
+    lambs_f[:, sale_age + 1:] = kept_f
+    lambs_m[:, sale_age + 1:] = 0
+
+    # Camino aleatorio lognormal del precio, un mes por columna
+    shocks = rng.normal(0.0, volatility / np.sqrt(12), size=(trials, months))
+    prices = base_price * np.exp(np.cumsum(shocks, axis=1))
+
+    result = {metric: np.empty((trials, months)) for metric in METRICS}
+
+    for month in range(months):
+        # Mortalidad
+        ewes = rng.binomial(ewes, survival)
+        rams = rng.binomial(rams, survival)
+        lambs_f = rng.binomial(lambs_f, survival)
+        lambs_m = rng.binomial(lambs_m, survival)
+
+        # Envejecer un mes: los que alcanzan la madurez pasan a adultos
+        ewes += lambs_f[:, -1]
+        rams += lambs_m[:, -1]
+        lambs_f = np.roll(lambs_f, 1, axis=1)
+        lambs_m = np.roll(lambs_m, 1, axis=1)
+
+        # Venta de corderos a la edad de venta: todos los machos y las
+        # hembras que no se quedan como reemplazo
+        kept_f = rng.binomial(lambs_f[:, sale_age], p['replacement_rate'])
+        lamb_sales = lambs_m[:, sale_age] + lambs_f[:, sale_age] - kept_f
+        if month == 0:
+            lamb_sales = lamb_sales + initial_sales
+        lambs_f[:, sale_age] = kept_f
+        lambs_m[:, sale_age] = 0
+
+        # Desecho de adultos
+        culled_ewes = rng.binomial(ewes, monthly_cull)
+        culled_rams = rng.binomial(rams, monthly_cull)
+        ewes -= culled_ewes
+        rams -= culled_rams
+        culls = culled_ewes + culled_rams
+
+        # Partos
+        births = rng.poisson(ewes * monthly_lambing)
+        born_f = rng.binomial(births, p['female_ratio'])
+        lambs_f[:, 0] = born_f
+        lambs_m[:, 0] = births - born_f
+
+        heads = ewes + rams + lambs_f.sum(axis=1) + lambs_m.sum(axis=1)
+        feed_kg = heads * p['feed_kg_per_day'] * DAYS_PER_MONTH
+
+        result['heads'][:, month] = heads
+        result['births'][:, month] = births
+        result['sales'][:, month] = lamb_sales + culls
+        result['revenue'][:, month] = prices[:, month] * (
+            lamb_sales + culls * p['cull_price_factor'])
+        result['feed_kg'][:, month] = feed_kg
+        result['feed_cost'][:, month] = feed_kg * cost_per_kg
+
+    return result
+
+
+def simulate(state, months=24, trials=1000, price_factor=1.0, params=None,
+             seed=0, workers=1):
+    """Ejecuta la simulación Monte Carlo y devuelve los arreglos (trials, months).
+
+    Los ensayos se reparten en bloques de BLOCK_SIZE; con workers > 1 los
+    bloques se ejecutan en un pool de procesos.
+    """
+    params = tuple(sorted({**DEFAULT_PARAMS, **(params or {})}.items()))
+
+    sizes = [BLOCK_SIZE] * (trials // BLOCK_SIZE)
+    if trials % BLOCK_SIZE:
+        sizes.append(trials % BLOCK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(state, months, size, price_factor, params, block_seed)
+            for size, block_seed in zip(sizes, seeds)]
+
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            blocks = list(executor.map(_simulate_block, *zip(*args)))
+    else:
+        blocks = [_simulate_block(*block_args) for block_args in args]
+
+    return {
+        metric: np.concatenate([block[metric] for block in blocks])
+        for metric in METRICS
+    }
+
+
+def summarize(results):
+    """Percentiles mensuales y totales del horizonte para cada métrica."""
+    summary = {}
+    for metric, values in results.items():
+        monthly = np.percentile(values, PERCENTILES, axis=0)
+        totals = np.percentile(values.sum(axis=1), PERCENTILES)
+        summary[metric] = {
+            'monthly': {f'p{pct}': monthly[i].round(2).tolist()
+                        for i, pct in enumerate(PERCENTILES)},
+            'total': {f'p{pct}': round(float(totals[i]), 2)
+                      for i, pct in enumerate(PERCENTILES)},
+        }
+    return summary
+
+
+def project(months=24, trials=1000, scenario='base', price_factor=None,
+            seed=0, workers=1, **params):
+    """Proyección del rebaño con los datos actuales de la base de datos.
+
+    `params` sobrescribe valores de DEFAULT_PARAMS (p. ej. lambing_rate=1.5).
+    El resultado se guarda en caché por estado del rebaño y parámetros.
+    """
+    unknown = set(params) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+    for name, value in params.items():
+        low, high = PARAM_RANGES[name]
+        if not math.isfinite(value) or not low <= value <= high:
+            raise ValueError(f"{name} debe estar entre {low} y {high}: {value}")
+    if not 1 <= months <= MAX_MONTHS:
+        raise ValueError(f"months debe estar entre 1 y {MAX_MONTHS}: {months}")
+    if not 1 <= trials <= MAX_TRIALS:
+        raise ValueError(f"trials debe estar entre 1 y {MAX_TRIALS}: {trials}")
+    if price_factor is None:
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Escenario desconocido: {scenario}")
+        price_factor = SCENARIOS[scenario]
+    elif not math.isfinite(price_factor) or price_factor < 0:
+        raise ValueError(f"price_factor no válido: {price_factor}")
+
+    merged = {**DEFAULT_PARAMS, **params}
+    state = load_flock_state(int(merged['maturity_age']))
+
+    # workers no cambia el resultado, por eso no forma parte de la clave
+    key = (state, months, trials, float(price_factor),
+           tuple(sorted(merged.items())), seed)
+    if key not in _cache:
+        if len(_cache) >= CACHE_SIZE:
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = summarize(simulate(state, months, trials, price_factor,
+                                         merged, seed, workers))
+    return _cache[key]
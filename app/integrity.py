@@ -0,0 +1,209 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect
+
+from app import db
+
+# Valores de estado de versiones anteriores y su equivalente actual; un
+# estado vacío se mostraba como 'active' en las plantillas
+LEGACY_STATUSES = {
+    '': 'active',
+    'activo': 'active',
+    'vendido': 'sold',
+    'muerto': 'deceased',
+    'fallecido': 'deceased',
+}
+
+# Máximo de filas listadas para revisión manual
+MAX_LISTED = 20
+
+
+def _report(message, count, repaired):
+    if count:
+        suffix = ' (corregido)' if repaired else ''
+        click.echo(f"  {message}: {count}{suffix}")
+
+
+def _warn(message, count):
+    if count:
+        click.echo(f"  Aviso: {message}: {count}")
+
+
+def _known_status(status):
+    from app.models.animal import ANIMAL_STATUSES
+
+    normalized = (status or '').strip().lower()
+    if normalized in ANIMAL_STATUSES:
+        return normalized
+    return LEGACY_STATUSES.get(normalized)
+
+
+def check_duplicate_sales(repair, chunk_size):
+    """Animales con más de una venta; al corregir se conserva la primera."""
+    from app.models.sale import Sale
+
+    duplicates = db.session.query(
+        Sale.animal_id, db.func.min(Sale.id)
+    ).group_by(Sale.animal_id).having(db.func.count(Sale.id) > 1).all()
+
+    extra = 0
+    for start in range(0, len(duplicates), chunk_size):
+        for animal_id, keep_id in duplicates[start:start + chunk_size]:
+            sales = Sale.query.filter(Sale.animal_id == animal_id, Sale.id != keep_id).all()
+            extra += len(sales)
+            if repair:
+                for sale in sales:
+                    db.session.delete(sale)
+        if repair:
+            db.session.commit()
+
+    _report('Ventas duplicadas del mismo animal', extra, repair)
+    return extra, 0
+
+
+def check_orphan_sales(repair, chunk_size):
+    """Ventas que apuntan a un animal inexistente; al corregir se eliminan."""
+    from app.models.animal import Animal
+    from app.models.sale import Sale
+
+    orphan_ids = [sale_id for sale_id, in db.session.query(Sale.id).outerjoin(
+        Animal, Sale.animal_id == Animal.id
+    ).filter(Animal.id.is_(None)).yield_per(chunk_size)]
+
+    if repair:
+        for start in range(0, len(orphan_ids), chunk_size):
+            ids = orphan_ids[start:start + chunk_size]
+            for sale in Sale.query.filter(Sale.id.in_(ids)):
+                db.session.delete(sale)
+            db.session.commit()
+
+    _report('Ventas de animales inexistentes', len(orphan_ids), repair)
+    return len(orphan_ids), 0
+
+
+def check_animal_status(repair, chunk_size):
+    """Recorre los animales por bloques comparando su estado con sus ventas."""
+    from app.models.animal import Animal, ANIMAL_STATUSES
+    from app.models.sale import Sale
+
+    invalid = sold_without_flag = flagged_without_sale = 0
+    unknown = []
+    last_id = 0
+
+    while True:
+        animals = db.session.query(Animal.id, Animal.status).filter(
+            Animal.id > last_id
+        ).order_by(Animal.id).limit(chunk_size).all()
+        if not animals:
+            break
+
+        first_id, last_id = animals[0].id, animals[-1].id
+        sales = {
+            animal_id: (sale_date, sale_price)
+            for animal_id, sale_date, sale_price in db.session.query(
+                Sale.animal_id, Sale.sale_date, Sale.sale_price
+            ).filter(Sale.animal_id.between(first_id, last_id)).order_by(Sale.id.desc())
+        }
+
+        # id del animal -> (estado correcto, venta o None)
+        fixes = {}
+        for animal_id, status in animals:
+            sale = sales.get(animal_id)
+            if status not in ANIMAL_STATUSES:
+                if sale:
+                    fixes[animal_id] = ('sold', sale)
+                elif _known_status(status):
+                    fixes[animal_id] = (_known_status(status), None)
+                else:
+                    # Adivinar 'active' volvería a poner el animal a la venta
+                    unknown.append((animal_id, status))
+                    continue
+                invalid += 1
+            elif sale and status != 'sold':
+                sold_without_flag += 1
+                fixes[animal_id] = ('sold', sale)
+            elif not sale and status == 'sold':
+                # Puede ser una venta anterior al módulo de ventas: solo se informa
+                flagged_without_sale += 1
+
+        if repair and fixes:
+            for animal in Animal.query.filter(Animal.id.in_(list(fixes))):
+                status, sale = fixes[animal.id]
+                animal.status = status
+                if sale:
+                    animal.sale_date = animal.sale_date or sale[0]
+                    animal.sale_price = animal.sale_price or sale[1]
+            db.session.commit()
+
+        # Liberar los objetos del bloque para no acumular memoria
+        db.session.expunge_all()
+
+    _report('Animales con estado no válido', invalid, repair)
+    _report("Animales vendidos sin estado 'sold'", sold_without_flag, repair)
+    _warn("animales 'sold' sin venta registrada", flagged_without_sale)
+    _warn('animales con estado desconocido (revisar manualmente)', len(unknown))
+    for animal_id, status in unknown[:MAX_LISTED]:
+        click.echo(f"    id={animal_id} estado={status!r}")
+    return invalid + sold_without_flag, flagged_without_sale + len(unknown)
+
+
+def check_schema(repair):
+    """Índices y restricciones del modelo que faltan en la base de datos."""
+    from app.models.animal import Animal
+    from app.models.audit import AuditLog
+    from app.models.sale import Sale
+
+    inspector = inspect(db.engine)
+    missing = 0
+
+    for table in (Animal.__table__, Sale.__table__, AuditLog.__table__):
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                missing += 1
+                click.echo(f"  Falta el índice {index.name} en {table.name}"
+                           + (' (creado)' if repair else ''))
+                if repair:
+                    index.create(db.engine)
+
+    warnings = 0
+    checks = {check['name'] for check in inspector.get_check_constraints(Animal.__tablename__)}
+    if 'ck_animals_status' not in checks:
+        # SQLite no permite agregar un CHECK a una tabla existente; el
+        # validador del modelo sigue rechazando estados no válidos
+        warnings += 1
+        click.echo("  Aviso: falta la restricción ck_animals_status en animals "
+                   "(requiere recrear la tabla)")
+
+    return missing, warnings
+
+
+@click.command('integrity-check')
+@click.option('--repair', is_flag=True, help='Corrige las inconsistencias encontradas.')
+@click.option('--chunk-size', default=5000, show_default=True,
+              help='Filas procesadas por bloque.')
+@with_appcontext
+def integrity_check(repair, chunk_size):
+    """Busca inconsistencias en la base de datos y opcionalmente las corrige."""
+    click.echo('Verificando integridad de la base de datos...')
+
+    # Primero se eliminan duplicados y huérfanos, así el estado de los
+    # animales y el índice único de ventas se calculan sobre datos limpios
+    problems = warnings = 0
+    for found, warned in (check_duplicate_sales(repair, chunk_size),
+                          check_orphan_sales(repair, chunk_size),
+                          check_animal_status(repair, chunk_size),
+                          check_schema(repair)):
+        problems += found
+        warnings += warned
+
+    # Los avisos no se pueden corregir con --repair y no afectan el código de salida
+    if warnings:
+        click.echo(f'{warnings} avisos para revisión manual')
+    if not problems:
+        click.echo('Sin inconsistencias')
+    elif not repair:
+        click.echo(f'{problems} inconsistencias encontradas; usa --repair para corregirlas')
+        raise SystemExit(1)
+    else:
+        click.echo(f'{problems} inconsistencias corregidas')
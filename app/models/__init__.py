@@ -6,5 +6,6 @@ from .feed import Feed
 from .inventory import Inventory
 from .sale import Sale
 from .user import User
+from .audit import AuditLog
 
 # No importar db aquí
\ No newline at end of file
@@ -1,6 +1,9 @@
 from app import db
 from datetime import datetime
 
+# Estados válidos de un animal
+ANIMAL_STATUSES = ('active', 'sold', 'deceased')
+
 class Animal(db.Model):
     __tablename__ = 'animals'
     
@@ -11,11 +14,24 @@ class Animal(db.Model):
     birth_date = db.Column(db.Date)
     gender = db.Column(db.String(10))
     weight = db.Column(db.Float)
-    status = db.Column(db.String(20), default='active')
+    status = db.Column(db.String(20), default='active', nullable=False, index=True)
     purchase_date = db.Column(db.Date)
     purchase_price = db.Column(db.Float)
     sale_date = db.Column(db.Date)
     sale_price = db.Column(db.Float)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.CheckConstraint(
+            "status IN ({})".format(', '.join(f"'{s}'" for s in ANIMAL_STATUSES)),
+            name='ck_animals_status'
+        ),
+    )
+    
+    @db.validates('status')
+    def validate_status(self, key, status):
+        if status not in ANIMAL_STATUSES:
+            raise ValueError(f'Estado de animal no válido: {status}')
+        return status
\ No newline at end of file
@@ -0,0 +1,18 @@
+from app import db
+from datetime import datetime
+
+class AuditLog(db.Model):
+    __tablename__ = 'audit_log'
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # insert, update, delete
+    changes = db.Column(db.Text)  # JSON compacto {campo: valor_nuevo}
+    user_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Las consultas de historial siempre filtran por fila y ordenan por fecha
+    __table_args__ = (
+        db.Index('ix_audit_log_row', 'table_name', 'row_id', 'created_at'),
+    )
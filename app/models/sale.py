@@ -5,7 +5,10 @@ class Sale(db.Model):
     __tablename__ = 'sales'
     
     id = db.Column(db.Integer, primary_key=True)
-    animal_id = db.Column(db.Integer, db.ForeignKey('animals.id'), nullable=False)
+    # Un animal solo puede venderse una vez; el índice único también sirve
+    # para las búsquedas por animal
+    animal_id = db.Column(db.Integer, db.ForeignKey('animals.id', ondelete='RESTRICT'),
+                          nullable=False, unique=True, index=True)
     sale_date = db.Column(db.Date, nullable=False)
     sale_price = db.Column(db.Float, nullable=False)
     buyer_name = db.Column(db.String(100))
@@ -13,5 +16,5 @@ class Sale(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relación con Animal
-    animal = db.relationship('Animal', backref='sales')
\ No newline at end of file
+    # Relación con Animal; borrar un animal vendido lo impide la base de datos
+    animal = db.relationship('Animal', backref=db.backref('sales', passive_deletes='all'))
\ No newline at end of file
@@ -2,6 +2,7 @@ from . import animals_bp
 from flask import render_template, request, flash, redirect, url_for
 from flask_login import login_required
 from datetime import datetime
+import math
 
 @animals_bp.route('/')
 @login_required
@@ -58,4 +59,35 @@ def add_animal():
 def animal_detail(id):
     from app.models.animal import Animal
     animal = Animal.query.get_or_404(id)
-    return render_template('animals/detail.html', animal=animal)
\ No newline at end of file
+    return render_template('animals/detail.html', animal=animal)
+
+@animals_bp.route('/forecast')
+@login_required
+def forecast():
+    from app.forecast import project, SCENARIOS, DEFAULT_PARAMS, PARAM_RANGES
+    
+    months = request.args.get('months', 24, type=int)
+    trials = request.args.get('trials', 1000, type=int)
+    scenario = request.args.get('scenario', 'base')
+    lambing_rate = request.args.get('lambing_rate', DEFAULT_PARAMS['lambing_rate'], type=float)
+    
+    # Limitar el horizonte y el número de ensayos a rangos razonables
+    months = min(max(months, 1), 36)
+    trials = min(max(trials, 100), 5000)
+    if scenario not in SCENARIOS:
+        scenario = 'base'
+    if not math.isfinite(lambing_rate):
+        lambing_rate = DEFAULT_PARAMS['lambing_rate']
+    low, high = PARAM_RANGES['lambing_rate']
+    lambing_rate = min(max(lambing_rate, low), high)
+    
+    summary = project(months=months, trials=trials, scenario=scenario,
+                      lambing_rate=lambing_rate)
+    
+    return render_template('animals/forecast.html',
+                         summary=summary,
+                         months=months,
+                         trials=trials,
+                         scenario=scenario,
+                         scenarios=SCENARIOS,
+                         lambing_rate=lambing_rate)
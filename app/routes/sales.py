@@ -38,6 +38,11 @@ def register_sale():
             # Validar que el animal existe
             animal = Animal.query.get_or_404(animal_id)
             
+            # Un animal solo se puede vender una vez
+            if animal.status != 'active':
+                flash('El animal ya no está disponible para la venta', 'danger')
+                return redirect(url_for('sales.register_sale'))
+            
             # Convertir fecha
             sale_date = datetime.strptime(sale_date_str, '%Y-%m-%d').date()
             
@@ -0,0 +1,6 @@
+// Auto-ocultar alertas después de 5 segundos
+setTimeout(() => {
+    document.querySelectorAll('.alert').forEach(alert => {
+        new bootstrap.Alert(alert).close();
+    });
+}, 5000);
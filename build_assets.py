@@ -0,0 +1,10 @@
+import os
+
+from app.assets import build_assets
+
+static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'static')
+
+manifest = build_assets(static_folder)
+for original, hashed in manifest.items():
+    print(f"{original} -> {hashed}")
+print(f"{len(manifest)} archivos estáticos generados en app/static/dist")
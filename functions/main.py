@@ -1,5 +1,86 @@
+# Punto de entrada de Cloud Functions para la aplicación Flask.
+#
+# Prueba local con el emulador de functions-framework (desde la raíz del repo):
+#   functions-framework --source=functions/main.py --target=flask_app --debug
+#
+# functions-framework reserva /static/ para sí mismo: en el despliegue esos
+# archivos los sirve Firebase Hosting desde public/static (predeploy de
+# firebase.json), por lo que nunca llegan a esta función.
+#
+# La app y el motor de base de datos se crean una sola vez al cargar el
+# módulo (arranque en frío); las invocaciones "calientes" reutilizan ambos.
+import io
+import os
+import sys
+import time
+
+_cold_start = time.perf_counter()
+
+# En el despliegue el paquete `app` se copia junto a este archivo (predeploy
+# de firebase.json); en local se importa desde la raíz del repositorio.
+_here = os.path.dirname(os.path.abspath(__file__))
+if not os.path.isdir(os.path.join(_here, 'app')):
+    sys.path.insert(0, os.path.dirname(_here))
+
+# K_SERVICE (gen2) o FUNCTION_NAME (gen1) solo existen en una instancia
+# desplegada; el emulador de Firebase define además FUNCTIONS_EMULATOR
+DEPLOYED = bool(os.environ.get('K_SERVICE') or os.environ.get('FUNCTION_NAME')) \
+    and os.environ.get('FUNCTIONS_EMULATOR') != 'true'
+
+if not os.environ.get('DATABASE_URL'):
+    if DEPLOYED:
+        # Una SQLite en /tmp sería una base vacía y distinta en cada instancia
+        raise RuntimeError(
+            "DATABASE_URL no está definida: configura la base de datos de "
+            "producción en las variables de entorno de la función"
+        )
+    # En el emulador local basta una SQLite temporal (solo /tmp es escribible)
+    os.environ['DATABASE_URL'] = 'sqlite:////tmp/gestion_borregos.db'
+
 import functions_framework
 
-@functions_framework.http
-def flask_app(request):
-    return "✅ ¡Firebase Functions funciona! " + str(request.path)
\ No newline at end of file
+from app import create_app
+
+try:
+    from firebase_functions import https_fn
+except ImportError:  # sin el SDK de Firebase basta con functions-framework
+    https_fn = None
+
+# CREATE_TABLES=0 omite db.create_all() cuando el esquema ya existe
+app = create_app(create_tables=os.environ.get('CREATE_TABLES', '1') != '0')
+
+COLD_START_MS = (time.perf_counter() - _cold_start) * 1000
+COLD_START_BUDGET_MS = float(os.environ.get('COLD_START_BUDGET_MS', 2000))
+
+if COLD_START_MS > COLD_START_BUDGET_MS:
+    print(f"ADVERTENCIA: arranque en frío de {COLD_START_MS:.0f} ms "
+          f"(presupuesto {COLD_START_BUDGET_MS:.0f} ms)")
+else:
+    print(f"Arranque en frío: {COLD_START_MS:.0f} ms")
+
+_warm = False
+
+
+def _dispatch(request):
+    global _warm
+
+    # functions-framework entrega un flask.Request y después de responder
+    # vuelve a leer su cuerpo; se lee una sola vez y la app recibe una copia
+    # para que al procesar un formulario no consuma el stream original
+    body = request.get_data()
+    environ = dict(request.environ, **{'wsgi.input': io.BytesIO(body)})
+    with app.request_context(environ):
+        response = app.full_dispatch_request()
+
+    # La primera respuesta de cada instancia informa el costo del arranque en frío
+    if not _warm:
+        _warm = True
+        response.headers['Server-Timing'] = f'cold-start;dur={COLD_START_MS:.1f}'
+
+    return response
+
+
+if https_fn is not None:
+    flask_app = https_fn.on_request()(_dispatch)
+else:
+    flask_app = functions_framework.http(_dispatch)
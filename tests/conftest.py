@@ -0,0 +1,29 @@
+import pytest
+
+from app import create_app, db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Cada prueba usa su propia base SQLite temporal
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app()
+    app.config['TESTING'] = True
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    from app.models.user import User
+
+    user = User(username='admin', email='admin@borregos.com')
+    user.set_password('admin123')
+    db.session.add(user)
+    db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    return client
@@ -0,0 +1,212 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app import db, forecast
+from app.models.animal import Animal
+
+# Estado sintético: (ovejas, carneros, hembras por edad, machos por edad,
+# precio promedio, desviación, costo por kg)
+STATE = (200, 10, (5,) * 12, (5,) * 12, 3000.0, 300.0, 4.0)
+
+
+def test_simulation_is_deterministic_for_seed_and_workers():
+    single = forecast.simulate(STATE, months=12, trials=600, seed=7, workers=1)
+    again = forecast.simulate(STATE, months=12, trials=600, seed=7, workers=1)
+    pooled = forecast.simulate(STATE, months=12, trials=600, seed=7, workers=2)
+
+    for metric in forecast.METRICS:
+        np.testing.assert_array_equal(single[metric], again[metric])
+        np.testing.assert_array_equal(single[metric], pooled[metric])
+
+    other = forecast.simulate(STATE, months=12, trials=600, seed=8)
+    assert not np.array_equal(single['heads'], other['heads'])
+
+
+def test_simulation_invariants():
+    results = forecast.simulate(STATE, months=24, trials=300, seed=1)
+    initial_heads = STATE[0] + STATE[1] + sum(STATE[2]) + sum(STATE[3])
+
+    for metric in forecast.METRICS:
+        assert (results[metric] >= 0).all()
+
+    # Lo vendido en un mes existía al cierre del mes anterior
+    previous = np.column_stack([
+        np.full(300, initial_heads), results['heads'][:, :-1]
+    ])
+    assert (results['sales'] <= previous).all()
+
+
+def test_lambs_past_sale_age_are_split_in_first_month():
+    # Solo corderos de 9 meses: los machos se venden y de las hembras
+    # solo se queda la fracción de reemplazo
+    lambs = tuple(100 if age == 9 else 0 for age in range(12))
+    state = (0, 0, lambs, lambs, 3000.0, None, 4.0)
+    params = {'monthly_mortality': 0.0, 'replacement_rate': 0.3}
+
+    results = forecast.simulate(state, months=1, trials=500, params=params, seed=2)
+
+    kept = results['heads'][:, 0]
+    assert (results['sales'][:, 0] + kept == 200).all()
+    assert abs(kept.mean() - 30) < 3
+
+
+@pytest.mark.parametrize('value', [-5, float('nan'), 1e300])
+def test_project_rejects_out_of_range_params(app, value):
+    with pytest.raises(ValueError):
+        forecast.project(months=6, trials=100, lambing_rate=value)
+
+
+def test_project_caches_per_parameter_set(app, monkeypatch):
+    db.session.add(Animal(ear_tag='B001', gender='Hembra', birth_date=date(2020, 1, 1)))
+    db.session.commit()
+
+    calls = []
+    simulate = forecast.simulate
+
+    def counting_simulate(*args, **kwargs):
+        calls.append(args)
+        return simulate(*args, **kwargs)
+
+    monkeypatch.setattr(forecast, 'simulate', counting_simulate)
+    monkeypatch.setattr(forecast, '_cache', {})
+
+    first = forecast.project(months=6, trials=100, lambing_rate=1.2)
+    assert forecast.project(months=6, trials=100, lambing_rate=1.2) is first
+    assert len(calls) == 1
+
+    forecast.project(months=6, trials=100, lambing_rate=1.5)
+    assert len(calls) == 2
+
+
+def test_feed_cost_per_kg_converts_units(app):
+    from app.models.feed import Feed
+
+    db.session.add_all([
+        Feed(name='Alfalfa', quantity=100, unit='kg', cost=500),
+        Feed(name='Maíz', quantity=1, unit='ton', cost=6000),
+        Feed(name='Sales minerales', quantity=500, unit='g', cost=50),
+        Feed(name='Avena', quantity=220.46226218, unit='lb', cost=700),
+        # Sin peso fijo: no entra en el costo por kg
+        Feed(name='Concentrado', quantity=3, unit='saco', cost=900),
+    ])
+    db.session.commit()
+
+    cost_per_kg = forecast.load_flock_state()[-1]
+    assert cost_per_kg == pytest.approx((500 + 6000 + 50 + 700) / (100 + 1000 + 0.5 + 100))
+
+
+@pytest.mark.parametrize('value', ['-5', 'nan', '1e300'])
+def test_forecast_route_clamps_lambing_rate(client, value):
+    response = client.get(f'/animals/forecast?months=6&lambing_rate={value}')
+    assert response.status_code == 200
+
+
+def _animal(ear_tag, status='active'):
+    animal = Animal(ear_tag=ear_tag, gender='Hembra', status=status)
+    db.session.add(animal)
+    db.session.commit()
+    return animal
+
+
+def _sale(animal_id):
+    from app.models.sale import Sale
+
+    return Sale(animal_id=animal_id, sale_date=date(2025, 1, 1), sale_price=3000)
+
+
+def test_one_sale_per_animal(app):
+    from sqlalchemy.exc import IntegrityError
+
+    animal = _animal('B001')
+    db.session.add(_sale(animal.id))
+    db.session.commit()
+
+    db.session.add(_sale(animal.id))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_animal_with_sale_cannot_be_deleted(app):
+    from sqlalchemy.exc import IntegrityError
+
+    animal = _animal('B001')
+    db.session.add(_sale(animal.id))
+    db.session.commit()
+
+    db.session.delete(animal)
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_validate_status(app):
+    animal = _animal('B001')
+    animal.status = 'deceased'
+    with pytest.raises(ValueError):
+        animal.status = 'vendido'
+
+
+def test_register_sale_rejects_non_active_animal(client):
+    from app.models.sale import Sale
+
+    animal = _animal('B001', status='sold')
+    response = client.post('/sales/register', data={
+        'animal_id': animal.id,
+        'sale_date': '2025-01-01',
+        'sale_price': '3000',
+    })
+
+    assert response.status_code == 302
+    assert Sale.query.count() == 0
+
+
+def _legacy_rows(app):
+    # Simula una base anterior a las restricciones: sin índice único,
+    # sin llaves foráneas y con estados antiguos
+    engine = db.engine
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA foreign_keys=OFF')
+        conn.exec_driver_sql('PRAGMA ignore_check_constraints=ON')
+        conn.exec_driver_sql('DROP INDEX ix_sales_animal_id')
+        for i in range(1, 6):
+            conn.exec_driver_sql(
+                "INSERT INTO animals (id, ear_tag, status) VALUES (?, ?, 'active')",
+                (i, f'B00{i}'))
+        conn.exec_driver_sql("UPDATE animals SET status='vendido' WHERE id=3")
+        conn.exec_driver_sql("UPDATE animals SET status='perdido' WHERE id=4")
+        sale = "INSERT INTO sales (animal_id, sale_date, sale_price) VALUES (?, '2025-01-01', 100)"
+        conn.exec_driver_sql(sale, (1,))
+        conn.exec_driver_sql(sale, (1,))
+        conn.exec_driver_sql(sale, (2,))
+        conn.exec_driver_sql(sale, (2,))
+        conn.exec_driver_sql(sale, (99,))
+        conn.commit()
+
+
+def test_integrity_check_finds_and_repairs(app):
+    from app.models.sale import Sale
+
+    _legacy_rows(app)
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['integrity-check', '--chunk-size', '2'])
+    assert result.exit_code == 1
+    assert 'Ventas duplicadas del mismo animal: 2' in result.output
+    assert 'Ventas de animales inexistentes: 1' in result.output
+    assert Sale.query.count() == 5
+
+    result = runner.invoke(args=['integrity-check', '--repair', '--chunk-size', '2'])
+    assert result.exit_code == 0
+    assert sorted(sale.animal_id for sale in Sale.query) == [1, 2]
+
+    statuses = {animal.id: animal.status for animal in Animal.query}
+    assert statuses == {1: 'sold', 2: 'sold', 3: 'sold', 4: 'perdido', 5: 'active'}
+    assert "id=4 estado='perdido'" in result.output
+
+    # Lo que queda son avisos: no cambia el código de salida
+    result = runner.invoke(args=['integrity-check', '--chunk-size', '2'])
+    assert result.exit_code == 0
+    assert 'Sin inconsistencias' in result.output
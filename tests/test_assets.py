@@ -0,0 +1,119 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+from flask import Flask, url_for
+
+from app.assets import build_assets, init_assets, load_manifest
+
+SCRIPT = 'document.querySelectorAll(".alert").forEach(function (el) {});\n' * 20
+
+
+@pytest.fixture
+def static_folder(tmp_path):
+    folder = tmp_path / 'static'
+    (folder / 'js').mkdir(parents=True)
+    (folder / 'js' / 'main.js').write_text(SCRIPT)
+    (folder / 'robots.txt').write_text('User-agent: *\n')
+    return str(folder)
+
+
+def _make_app(static_folder, debug=False):
+    app = Flask(__name__, static_folder=static_folder)
+    app.debug = debug
+    init_assets(app)
+
+    @app.route('/')
+    def index():
+        return '<p>Gestión de Borregos</p>' * 100
+
+    return app
+
+
+def test_build_assets_writes_hashed_files_and_manifest(static_folder):
+    manifest = build_assets(static_folder)
+
+    hashed = manifest['js/main.js']
+    assert hashed.startswith('dist/js/main.') and hashed.endswith('.js')
+    dist = os.path.join(static_folder, 'dist')
+    with open(os.path.join(static_folder, hashed)) as f:
+        assert f.read() == SCRIPT
+    with open(os.path.join(static_folder, hashed + '.gz'), 'rb') as f:
+        assert gzip.decompress(f.read()).decode() == SCRIPT
+    # Archivos pequeños no se comprimen
+    assert not os.path.exists(os.path.join(static_folder, manifest['robots.txt'] + '.gz'))
+
+    with open(os.path.join(dist, 'manifest.json')) as f:
+        assert json.load(f) == manifest
+
+    # Reconstruir no incluye la carpeta dist en el manifiesto
+    assert build_assets(static_folder) == manifest
+
+
+def test_url_for_uses_hashed_name_except_in_debug(static_folder):
+    manifest = build_assets(static_folder)
+
+    app = _make_app(static_folder)
+    with app.test_request_context():
+        assert url_for('static', filename='js/main.js') == '/static/' + manifest['js/main.js']
+        assert url_for('static', filename='js/other.js') == '/static/js/other.js'
+
+    app = _make_app(static_folder, debug=True)
+    with app.test_request_context():
+        assert url_for('static', filename='js/main.js') == '/static/js/main.js'
+
+
+def test_stale_manifest_is_ignored(static_folder):
+    manifest = build_assets(static_folder)
+    assert load_manifest(static_folder) == manifest
+
+    source = os.path.join(static_folder, 'js', 'main.js')
+    with open(source, 'a') as f:
+        f.write('console.log("editado");\n')
+    later = time.time() + 10
+    os.utime(source, (later, later))
+
+    assert load_manifest(static_folder) == {}
+    app = _make_app(static_folder)
+    with app.test_request_context():
+        assert url_for('static', filename='js/main.js') == '/static/js/main.js'
+
+
+def test_hashed_file_served_precompressed_and_immutable(static_folder):
+    manifest = build_assets(static_folder)
+    client = _make_app(static_folder).test_client()
+    url = '/static/' + manifest['js/main.js']
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype in ('text/javascript', 'application/javascript')
+    assert gzip.decompress(response.data).decode() == SCRIPT
+    assert 'Accept-Encoding' in response.headers['Vary']
+    cache_control = response.cache_control
+    assert cache_control.public and cache_control.immutable
+    assert cache_control.max_age == 31536000
+    assert not cache_control.no_cache
+
+    response = client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data.decode() == SCRIPT
+
+    # Los archivos sin hash conservan el comportamiento por defecto de Flask
+    response = client.get('/static/js/main.js')
+    assert not response.cache_control.immutable
+    response.close()
+
+
+def test_html_responses_are_gzipped(static_folder):
+    client = _make_app(static_folder).test_client()
+
+    response = client.get('/', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data).decode() == '<p>Gestión de Borregos</p>' * 100
+
+    response = client.get('/')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.audit import history, state_at
+from app.models.audit import AuditLog
+from app.models.feed import Feed
+
+
+def _create_feed():
+    feed = Feed(name='Alfalfa', quantity=100, unit='kg')
+    db.session.add(feed)
+    db.session.commit()
+    return feed
+
+
+def test_state_at_insert_update_delete(app):
+    before = datetime.utcnow()
+    feed = _create_feed()
+    feed_id = feed.id
+    after_insert = datetime.utcnow()
+
+    feed.quantity = 80
+    feed.supplier = 'Forrajes del Norte'
+    db.session.commit()
+    after_update = datetime.utcnow()
+
+    db.session.delete(feed)
+    db.session.commit()
+
+    assert [entry.action for entry in history(Feed, feed_id)] == ['insert', 'update', 'delete']
+    assert state_at(Feed, feed_id, before) is None
+
+    state = state_at(Feed, feed_id, after_insert)
+    assert state['quantity'] == 100
+    assert state['supplier'] is None
+
+    state = state_at(Feed, feed_id, after_update)
+    assert state['quantity'] == 80
+    assert state['supplier'] == 'Forrajes del Norte'
+    assert state['name'] == 'Alfalfa'
+
+    assert state_at(Feed, feed_id, datetime.utcnow()) is None
+
+
+def test_state_at_accepts_utc_date(app):
+    feed = _create_feed()
+    feed.purchase_date = datetime(2024, 1, 2).date()
+    db.session.commit()
+
+    today = datetime.utcnow().date()
+    state = state_at(Feed, feed.id, today)
+    assert state['purchase_date'] == datetime(2024, 1, 2).date()
+    assert state_at(Feed, feed.id, today - timedelta(days=1)) is None
+
+
+def test_timestamp_only_changes_are_not_logged(app):
+    feed = _create_feed()
+    feed.updated_at = datetime.utcnow() + timedelta(hours=1)
+    feed.created_at = datetime.utcnow() - timedelta(days=1)
+    db.session.commit()
+
+    # Asignar el mismo valor (ya cargado) tampoco es un cambio
+    assert feed.quantity == 100
+    feed.quantity = 100
+    db.session.commit()
+
+    assert [entry.action for entry in history(Feed, feed.id)] == ['insert']
+    assert 'updated_at' not in history(Feed, feed.id)[0].changes
+
+
+def test_flushes_share_one_transaction_batch(app):
+    feed = _create_feed()
+    for quantity in (90, 80, 70):
+        feed.quantity = quantity
+        db.session.flush()
+
+    # Nada se escribe hasta el commit; un rollback descarta lo pendiente
+    assert AuditLog.query.filter_by(action='update').count() == 0
+    db.session.rollback()
+    assert AuditLog.query.filter_by(action='update').count() == 0
+
+    feed.quantity = 60
+    db.session.flush()
+    feed.unit = 'ton'
+    db.session.commit()
+    assert [entry.changes for entry in history(Feed, feed.id)][1:] == [
+        '{"quantity":60}', '{"unit":"ton"}'
+    ]
+
+
+def test_savepoint_rollback_discards_its_rows(app):
+    feed = _create_feed()
+    feed.quantity = 90
+    db.session.flush()
+
+    savepoint = db.session.begin_nested()
+    feed.unit = 'ton'
+    db.session.flush()
+    savepoint.rollback()
+
+    with db.session.begin_nested():
+        feed.supplier = 'Forrajes del Norte'
+
+    db.session.commit()
+    assert [entry.changes for entry in history(Feed, feed.id)][1:] == [
+        '{"quantity":90}', '{"supplier":"Forrajes del Norte"}'
+    ]
+
+
+def test_history_does_not_write_pending_rows(app):
+    feed = _create_feed()
+    feed.quantity = 50
+    db.session.flush()
+
+    # Las entradas pendientes se ven, pero no se insertan hasta el commit
+    assert [entry.action for entry in history(Feed, feed.id)] == ['insert', 'update']
+    assert state_at(Feed, feed.id, datetime.utcnow())['quantity'] == 50
+    assert AuditLog.query.filter_by(action='update').count() == 0
+
+    db.session.rollback()
+    assert [entry.action for entry in history(Feed, feed.id)] == ['insert']
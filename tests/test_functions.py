@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+functions_framework = pytest.importorskip('functions_framework')
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    'functions', 'main.py')
+
+
+@pytest.fixture
+def function_client(tmp_path, monkeypatch):
+    # Igual que el emulador local: functions-framework carga functions/main.py
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'function.db'}")
+    for name in ('K_SERVICE', 'FUNCTION_NAME', 'FUNCTIONS_EMULATOR'):
+        monkeypatch.delenv(name, raising=False)
+    app = functions_framework.create_app(target='flask_app', source=MAIN)
+    return app.test_client()
+
+
+def test_login_form_through_function(function_client):
+    response = function_client.get('/login')
+    assert response.status_code == 200
+    assert 'Server-Timing' in response.headers
+
+    response = function_client.post('/register', data={
+        'username': 'pastor',
+        'email': 'pastor@borregos.com',
+        'password': 'secreto',
+        'confirm_password': 'secreto',
+    })
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/login')
+
+    response = function_client.post('/login', data={
+        'username': 'pastor',
+        'password': 'secreto',
+    })
+    assert response.status_code == 302
+    assert response.headers['Location'] == '/index'
+
+    response = function_client.get('/')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers